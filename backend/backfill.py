@@ -0,0 +1,320 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import time
+import uuid
+from typing import Dict, Any, List, Optional, Set, Tuple
+from dataclasses import dataclass, field
+
+import aiohttp
+import asyncpg
+from dotenv import load_dotenv
+
+from concurrency import BenchmarkConfig, add_transport_args, create_transport
+from fanout import DEFAULT_FANOUT_LANGUAGES, fanout_translate
+from replay import StreamRecorder
+
+load_dotenv()
+
+# Author-language text columns that viewers see translated
+TRANSLATABLE_FIELDS = {
+    "todos": ["label", "notes", "reward"],
+    "comments": ["comment_content"],
+}
+
+# Native primary key type and a value below every real id, so paging uses the pkey index
+ROW_ID_TYPES = {
+    "todos": (int, 0),
+    "comments": (uuid.UUID, uuid.UUID(int=0)),
+}
+
+class BackfillDefaults:
+    BATCH_SIZE = 200
+    CONCURRENCY = 8
+    CHECKPOINT_PATH = "backfill_checkpoint.json"
+    MAX_TOKENS = 1000  # Same limit as the frontend translate route, room for long notes
+
+# Table and column names only ever come from TRANSLATABLE_FIELDS
+UNTRANSLATED_QUERY = """
+SELECT t.id, t.id::TEXT AS row_id, t.{field} AS content,
+  ARRAY(
+    SELECT lang FROM unnest($1::TEXT[]) AS lang
+    WHERE NOT EXISTS (
+      SELECT 1 FROM translations tr
+      WHERE tr.source_table = '{table}'
+        AND tr.row_id = t.id::TEXT
+        AND tr.field = '{field}'
+        AND tr.language = lang
+        AND tr.content_hash = encode(sha256(convert_to(t.{field}, 'UTF8')), 'hex')
+    )
+  ) AS missing
+FROM {table} t
+WHERE t.{field} IS NOT NULL AND btrim(t.{field}) <> '' AND t.id > $2
+ORDER BY t.id
+LIMIT $3
+"""
+
+KNOWN_TRANSLATIONS_QUERY = """
+SELECT DISTINCT ON (content_hash, language) content_hash, language, translated_text
+FROM translations
+WHERE content_hash = ANY($1::TEXT[]) AND language = ANY($2::TEXT[])
+"""
+
+INSERT_TRANSLATION = """
+INSERT INTO translations (source_table, row_id, field, language, content_hash, translated_text)
+VALUES ($1, $2, $3, $4, $5, $6)
+ON CONFLICT (source_table, row_id, field, language, content_hash) DO NOTHING
+"""
+
+def content_hash(text: str) -> str:
+    """Hex SHA-256 of the source text, matching the SQL used in UNTRANSLATED_QUERY"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+@dataclass
+class BackfillConfig:
+    """Configuration for the translation backfill"""
+    dsn: str
+    languages: List[str]
+    batch_size: int = BackfillDefaults.BATCH_SIZE
+    concurrency: int = BackfillDefaults.CONCURRENCY
+    checkpoint_path: str = BackfillDefaults.CHECKPOINT_PATH
+    model_name: Optional[str] = None  # OpenAI model, SEA-LION when unset
+    max_tokens: int = BackfillDefaults.MAX_TOKENS
+
+@dataclass
+class BackfillStats:
+    """Counters for the backfill throughput report"""
+    start_time: float = field(default_factory=time.time)
+    rows_scanned: int = 0
+    rows_translated: int = 0
+    translations_written: int = 0
+    unique_texts: int = 0
+    model_requests: int = 0
+    reused_translations: int = 0
+    failed_requests: int = 0
+
+    def rows_per_second(self) -> float:
+        elapsed = time.time() - self.start_time
+        return self.rows_translated / elapsed if elapsed > 0 else 0
+
+class Checkpoint:
+    """
+    Last fully translated row id per table field, saved after every committed batch
+    The checkpoint only lets a restarted run skip rows it already finished. It never moves
+    past a row with a failed translation, so the next run retries from there. Missing
+    translations are found with an anti-join on the translations table, so deleting the
+    checkpoint (or running with --restart) rescans everything.
+    """
+
+    def __init__(self, path: str, languages: List[str], restart: bool = False):
+        self.path = path
+        self.languages = sorted(languages)
+        self.cursors: Dict[str, str] = {}
+        if not restart and os.path.exists(path):
+            with open(path) as f:
+                saved = json.load(f)
+            # A different language set needs a full rescan
+            if saved.get("languages") == self.languages:
+                self.cursors = saved.get("cursors", {})
+
+    def get(self, key: str) -> Optional[str]:
+        return self.cursors.get(key)
+
+    def save(self, key: str, row_id: str) -> None:
+        """Record that every row up to and including row_id is fully translated"""
+        self.cursors[key] = row_id
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"languages": self.languages, "cursors": self.cursors}, f)
+        os.replace(tmp_path, self.path)
+
+class TranslationBackfill:
+    """Translates untranslated todo and comment fields in bulk into the translations table"""
+
+    def __init__(self, config: BackfillConfig, pool: asyncpg.Pool, session: aiohttp.ClientSession, checkpoint: Checkpoint):
+        self.config = config
+        self.pool = pool
+        self.session = session
+        self.checkpoint = checkpoint
+        self.semaphore = asyncio.Semaphore(config.concurrency)
+        self.stats = BackfillStats()
+
+    async def run(self) -> BackfillStats:
+        """Backfill every translatable field"""
+        for table, fields in TRANSLATABLE_FIELDS.items():
+            for field_name in fields:
+                await self.backfill_field(table, field_name)
+        return self.stats
+
+    async def backfill_field(self, table: str, field_name: str) -> None:
+        """Page through one field by row id, translating and committing batch by batch"""
+        key = f"{table}.{field_name}"
+        query = UNTRANSLATED_QUERY.format(table=table, field=field_name)
+        id_type, first_id = ROW_ID_TYPES[table]
+        saved = self.checkpoint.get(key)
+        cursor = id_type(saved) if saved else first_id
+        held_at = None  # First row left untranslated; the checkpoint stops before it
+
+        while True:
+            async with self.pool.acquire() as conn:
+                rows = await conn.fetch(query, self.config.languages, cursor, self.config.batch_size)
+            if not rows:
+                break
+
+            incomplete = await self.process_batch(table, field_name, rows)
+            if held_at is None:
+                complete_until = None
+                for row in rows:
+                    if row["row_id"] in incomplete:
+                        held_at = row["row_id"]
+                        break
+                    complete_until = row["id"]
+                if complete_until is not None:
+                    self.checkpoint.save(key, str(complete_until))
+            cursor = rows[-1]["id"]
+            print(f"{key:<25} up to row {cursor}: {self.stats.rows_translated} rows, {self.stats.rows_per_second():.1f} rows/s")
+
+        if held_at is not None:
+            print(f"{key:<25} some rows were not fully translated; checkpoint held before row {held_at} so the next run retries them")
+
+    async def process_batch(self, table: str, field_name: str, rows: List[asyncpg.Record]) -> Set[str]:
+        """
+        Translate each distinct text once and write a translation for every row
+        Returns the ids of rows still missing at least one language.
+        """
+        self.stats.rows_scanned += len(rows)
+        pending = [(row["row_id"], row["content"], content_hash(row["content"]), row["missing"]) for row in rows if row["missing"]]
+        if not pending:
+            return set()
+
+        # Deduplicate by content so repeated labels ("Take medicine") are translated once
+        needed: Dict[str, Tuple[str, Set[str]]] = {}
+        for _, content, text_hash, missing in pending:
+            needed.setdefault(text_hash, (content, set()))[1].update(missing)
+
+        # Kept per batch so memory stays bounded; reuse across batches comes from the table
+        cache: Dict[str, Dict[str, str]] = {}  # content hash -> language -> translation
+        await self.load_known_translations(needed, cache)
+        await asyncio.gather(*(
+            self.translate(text_hash, content, languages.difference(cache.get(text_hash, {})), cache)
+            for text_hash, (content, languages) in needed.items()
+        ))
+
+        records = []
+        translated_rows = 0
+        incomplete = set()
+        for row_id, _, text_hash, missing in pending:
+            translations = cache.get(text_hash, {})
+            row_records = [(table, row_id, field_name, language, text_hash, translations[language]) for language in missing if language in translations]
+            if row_records:
+                translated_rows += 1
+                records.extend(row_records)
+            if len(row_records) < len(missing):
+                incomplete.add(row_id)
+
+        if records:
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    await conn.executemany(INSERT_TRANSLATION, records)
+        self.stats.rows_translated += translated_rows
+        self.stats.translations_written += len(records)
+        return incomplete
+
+    async def load_known_translations(self, needed: Dict[str, Tuple[str, Set[str]]], cache: Dict[str, Dict[str, str]]) -> None:
+        """Reuse translations already stored for the same text on other rows"""
+        hashes = list(needed)
+        async with self.pool.acquire() as conn:
+            known = await conn.fetch(KNOWN_TRANSLATIONS_QUERY, hashes, self.config.languages)
+        for row in known:
+            cache.setdefault(row["content_hash"], {})[row["language"]] = row["translated_text"]
+        self.stats.reused_translations += len(known)
+
+    async def translate(self, text_hash: str, content: str, languages: Set[str], cache: Dict[str, Dict[str, str]]) -> None:
+        """Fan one text out to its missing languages, bounded by the concurrency limit"""
+        if not languages:
+            return
+        async with self.semaphore:
+            # Priming only pays off with vLLM's prefix cache, not with OpenAI models
+            results = await fanout_translate(self.session, content, sorted(languages), self.config.model_name, prime_prefix=self.config.model_name is None, max_tokens=self.config.max_tokens)
+
+        self.stats.unique_texts += 1
+        self.stats.model_requests += len(results)
+        translations = cache.setdefault(text_hash, {})
+        for language, result in results.items():
+            translated = result.get("response", "").strip() if result.get("success") else ""
+            # A translation cut off by the token limit would be stored and reused for good
+            if translated and result.get("finish_reason") != "length":
+                translations[language] = translated
+            else:
+                self.stats.failed_requests += 1
+
+def print_backfill_results(stats: BackfillStats):
+    """Print backfill throughput results"""
+    elapsed = time.time() - stats.start_time
+    print(f"\n{'='*60}")
+    print(f"BACKFILL RESULTS")
+    print(f"{'='*60}")
+    print(f"Rows scanned: {stats.rows_scanned}")
+    print(f"Rows translated: {stats.rows_translated}")
+    print(f"Translations written: {stats.translations_written}")
+    print(f"")
+    print(f"DEDUPLICATION:")
+    print(f"  Unique texts sent to the model: {stats.unique_texts}")
+    print(f"  Model requests: {stats.model_requests} ({stats.failed_requests} failed)")
+    print(f"  Translations reused from the table: {stats.reused_translations}")
+    print(f"")
+    print(f"THROUGHPUT:")
+    print(f"  Elapsed: {elapsed:.1f}s")
+    print(f"  Rows per second: {stats.rows_per_second():.1f} rows/s")
+    print(f"  Translations per second: {stats.translations_written / elapsed if elapsed > 0 else 0:.1f}/s")
+
+async def main():
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description="Bulk translate todos and comments into the translations table")
+    parser.add_argument("--dsn", default=os.getenv("DATABASE_URL"), help="Postgres connection string (default: $DATABASE_URL)")
+    parser.add_argument("--languages", nargs="+", default=DEFAULT_FANOUT_LANGUAGES, help="target language codes")
+    parser.add_argument("--batch-size", type=int, default=BackfillDefaults.BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=BackfillDefaults.CONCURRENCY, help="distinct texts translated at once")
+    parser.add_argument("--checkpoint", default=BackfillDefaults.CHECKPOINT_PATH, help="checkpoint file path")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and rescan all rows")
+    parser.add_argument("--model", help="OpenAI model to use instead of SEA-LION")
+    parser.add_argument("--max-tokens", type=int, default=BackfillDefaults.MAX_TOKENS, help="token limit per translation; truncated translations are not stored")
+    add_transport_args(parser)
+    args = parser.parse_args()
+
+    if not args.dsn:
+        parser.error("--dsn or DATABASE_URL is required")
+
+    config = BackfillConfig(
+        dsn=args.dsn,
+        languages=args.languages,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        checkpoint_path=args.checkpoint,
+        model_name=args.model,
+        max_tokens=args.max_tokens,
+    )
+    http_config = BenchmarkConfig(transport=create_transport(args))
+    checkpoint = Checkpoint(config.checkpoint_path, config.languages, args.restart)
+
+    print("TRANSLATION BACKFILL")
+    print(f"Target languages: {', '.join(config.languages)}")
+    print("="*60)
+
+    pool = await asyncpg.create_pool(config.dsn, min_size=1, max_size=2)
+    try:
+        async with aiohttp.ClientSession(connector=http_config.create_connector(), timeout=http_config.create_timeout()) as session:
+            backfill = TranslationBackfill(config, pool, http_config.wrap_session(session), checkpoint)
+            stats = await backfill.run()
+    finally:
+        await pool.close()
+
+    print_backfill_results(stats)
+
+    if isinstance(http_config.transport, StreamRecorder):
+        http_config.transport.save()
+
+if __name__ == "__main__":
+    asyncio.run(main())
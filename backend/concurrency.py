@@ -1,3 +1,4 @@
+import argparse
 import asyncio
 import aiohttp
 import json
@@ -8,6 +9,8 @@ from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
 from dotenv import load_dotenv
 
+from replay import ReplaySession, StreamRecorder, StreamReplayer
+
 load_dotenv()
 
 
@@ -33,6 +36,7 @@ class Limits:
     CONNECTION_POOL = 100
     PER_HOST = 30
     RESPONSE_PREVIEW = 50
+    OPENAI_MAX_TOKENS = 150  # Short limit discourages reasoning in benchmark responses
 
 @dataclass
 class BenchmarkConfig:
@@ -44,6 +48,11 @@ class BenchmarkConfig:
     connect_timeout: int = Timeouts.CONNECT
     sock_read_timeout: int = Timeouts.SOCK_READ
     response_preview_length: int = Limits.RESPONSE_PREVIEW
+    transport: Optional[Any] = None  # StreamRecorder or StreamReplayer, see replay.py
+    
+    def wrap_session(self, session: aiohttp.ClientSession) -> Any:
+        """Route session requests through the record/replay transport, if any"""
+        return self.transport.wrap(session) if self.transport else session
     
     def create_connector(self) -> aiohttp.TCPConnector:
         """Create TCP connector with configured limits"""
@@ -72,6 +81,7 @@ class TimingTracker:
         self.first_token_time: Optional[float] = None
         self.token_count = 0
         self.full_response = ""
+        self.finish_reason: Optional[str] = None
     
     def record_token(self, content: str) -> None:
         """Record a new token"""
@@ -95,7 +105,8 @@ class TimingTracker:
         return {
             "time_to_first_token": self.first_token_time,
             "tokens_per_second": tokens_per_second,
-            "response": self.full_response
+            "response": self.full_response,
+            "finish_reason": self.finish_reason
         }
 
 async def parse_sse_stream(response: aiohttp.ClientResponse, timing: TimingTracker) -> bool:
@@ -114,6 +125,8 @@ async def parse_sse_stream(response: aiohttp.ClientResponse, timing: TimingTrack
                 try:
                     chunk = json.loads(data)
                     if 'choices' in chunk and len(chunk['choices']) > 0:
+                        if chunk['choices'][0].get('finish_reason'):
+                            timing.finish_reason = chunk['choices'][0]['finish_reason']
                         delta = chunk['choices'][0].get('delta', {})
                         if 'content' in delta and delta['content']:
                             timing.record_token(delta['content'])
@@ -135,19 +148,25 @@ def create_result_dict(model_name: str, timing: TimingTracker, success: bool = T
         **metrics
     }
 
-async def benchmark_sealion_async(session: aiohttp.ClientSession, prompt: str) -> Dict[str, Any]:
+def build_messages(prompt: str) -> List[Dict[str, str]]:
+    """Build the default translation chat messages for a prompt"""
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+async def benchmark_sealion_async(session: aiohttp.ClientSession, prompt: str, messages: Optional[List[Dict[str, str]]] = None, timing: Optional[TimingTracker] = None, max_tokens: Optional[int] = None) -> Dict[str, Any]:
     """Async benchmark for SEA-LION model"""
     payload = {
         "model": ModelNames.SEA_LION,
-        "messages": [
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": prompt}
-        ],
+        "messages": messages or build_messages(prompt),
         "stream": True,
     }
+    if max_tokens:
+        payload["max_tokens"] = max_tokens
 
     headers = {"Content-Type": "application/json", "Accept": "text/event-stream"}
-    timing = TimingTracker()
+    timing = timing or TimingTracker()
 
     try:
         async with session.post(APIEndpoints.MODAL_URL, json=payload, headers=headers) as response:
@@ -164,20 +183,17 @@ async def benchmark_sealion_async(session: aiohttp.ClientSession, prompt: str) -
     except Exception as e:
         return create_result_dict(ModelNames.SEA_LION_MODEL, timing, False, str(e))
 
-async def benchmark_openai_async(session: aiohttp.ClientSession, prompt: str, model_name: str) -> Dict[str, Any]:
+async def benchmark_openai_async(session: aiohttp.ClientSession, prompt: str, model_name: str, messages: Optional[List[Dict[str, str]]] = None, timing: Optional[TimingTracker] = None, max_tokens: int = Limits.OPENAI_MAX_TOKENS) -> Dict[str, Any]:
     """Async benchmark for OpenAI models"""
-    if not os.getenv("OPENAI_API_KEY"):
+    if not os.getenv("OPENAI_API_KEY") and not isinstance(session, ReplaySession):
         return create_result_dict(model_name, TimingTracker(), False, "OPENAI_API_KEY not set")
 
     payload = {
         "model": model_name,
-        "messages": [
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": prompt}
-        ],
+        "messages": messages or build_messages(prompt),
         "stream": True,
         "temperature": 0.1,
-        "max_tokens": 150,
+        "max_tokens": max_tokens,
         "top_p": 0.9,
     }
 
@@ -186,7 +202,7 @@ async def benchmark_openai_async(session: aiohttp.ClientSession, prompt: str, mo
         "Content-Type": "application/json"
     }
 
-    timing = TimingTracker()
+    timing = timing or TimingTracker()
 
     try:
         async with session.post(APIEndpoints.OPENAI_URL, json=payload, headers=headers) as response:
@@ -327,7 +343,7 @@ async def perform_warmup(config: BenchmarkConfig, test_prompt: str) -> bool:
     timeout = aiohttp.ClientTimeout(total=120, connect=10, sock_read=60)
     
     async with aiohttp.ClientSession(connector=connector, timeout=timeout) as warmup_session:
-        warmup_result = await benchmark_sealion_async(warmup_session, test_prompt)
+        warmup_result = await benchmark_sealion_async(config.wrap_session(warmup_session), test_prompt)
         if warmup_result['success']:
             print(f"SEA-LION warmed up successfully")
             print(f"Response: {warmup_result['response'][:config.response_preview_length]}{'...' if len(warmup_result['response']) > config.response_preview_length else ''}")
@@ -383,6 +399,7 @@ async def test_concurrency_levels_async(test_prompt: str, concurrency_levels: Li
     timeout = config.create_timeout()
     
     async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        session = config.wrap_session(session)
         for i, level in enumerate(concurrency_levels):
             await run_single_concurrency_test(session, test_prompt, level, config)
             
@@ -391,10 +408,29 @@ async def test_concurrency_levels_async(test_prompt: str, concurrency_levels: Li
                 print(f"\nWaiting before next concurrency level...")
                 await asyncio.sleep(Timeouts.BETWEEN_LEVELS)
 
+def add_transport_args(parser: argparse.ArgumentParser) -> None:
+    """Add record/replay command line options"""
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--record", metavar="PATH", help="record upstream streams to PATH (.jsonl.gz)")
+    group.add_argument("--replay", metavar="PATH", help="replay streams from PATH instead of calling upstream")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="replay timing scale, 0 for no delays (default: 1.0)")
+
+def create_transport(args: argparse.Namespace) -> Optional[Any]:
+    """Create the record/replay transport selected on the command line"""
+    if args.record:
+        return StreamRecorder(args.record)
+    if args.replay:
+        return StreamReplayer(args.replay, args.replay_speed)
+    return None
+
 async def main():
     """Main execution function"""
+    parser = argparse.ArgumentParser(description="Async concurrency test: SEA-LION vs OpenAI")
+    add_transport_args(parser)
+    args = parser.parse_args()
+
     # Configuration
-    config = BenchmarkConfig()
+    config = BenchmarkConfig(transport=create_transport(args))
     test_prompt = "Hello! Can I have a cup of coffee?"
     concurrency_levels = [1, 5, 10, 25, 50]
     
@@ -413,5 +449,8 @@ async def main():
     # Run concurrency tests
     await test_concurrency_levels_async(test_prompt, concurrency_levels, config)
 
+    if isinstance(config.transport, StreamRecorder):
+        config.transport.save()
+
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
@@ -0,0 +1,301 @@
+import argparse
+import asyncio
+import time
+import statistics
+import uuid
+from typing import Dict, Any, List, Optional, AsyncIterator
+from dataclasses import dataclass
+
+import aiohttp
+
+from concurrency import (
+    BenchmarkConfig,
+    Limits,
+    ModelNames,
+    TimingTracker,
+    Timeouts,
+    add_transport_args,
+    create_transport,
+    benchmark_sealion_async,
+    benchmark_openai_async,
+    create_result_dict,
+    perform_warmup,
+)
+from replay import StreamRecorder, StreamReplayer
+
+# Language codes and names mirror frontend/lib/languageConfig.ts
+TARGET_LANGUAGES = {
+    "en": "English",
+    "zh": "Chinese (Simplified)",
+    "ta": "Tamil",
+    "ms": "Malay (Bahasa Melayu)",
+    "tl": "Tagalog (Filipino)",
+    "id": "Bahasa Indonesia",
+    "my": "Burmese (Myanmar)",
+}
+
+DEFAULT_FANOUT_LANGUAGES = ["en", "id", "tl", "my"]
+
+# The system prompt and source text are identical for every target language, so vLLM's
+# prefix cache can reuse their KV blocks. Only the trailing instruction differs.
+FANOUT_SYSTEM_PROMPT = "You are a helpful multilingual assistant specializing in Southeast Asian languages. You will be given a text and then asked to translate it into a target language. Only return the translated text, nothing else. Do not add any explanations or additional text, or show your reasoning."
+
+# Per-language prompt used by the independent baseline, where the language sits at the
+# start of the system prompt like SYSTEM_PROMPT in concurrency.py
+INDEPENDENT_SYSTEM_PROMPT = "You are a helpful multilingual assistant specializing in Southeast Asian languages. You are to translate the given text into {language}. Only return the translated text, nothing else. Do not add any explanations or additional text, or show your reasoning."
+
+def language_name(code: str) -> str:
+    """Get the prompt-friendly name for a language code"""
+    return TARGET_LANGUAGES.get(code, code)
+
+def _salted(prompt: str, cache_salt: Optional[str]) -> str:
+    """Prefix a prompt with a salt so it shares no prefix cache blocks with other salts"""
+    return f"[{cache_salt}]\n{prompt}" if cache_salt else prompt
+
+def build_fanout_messages(text: str, language: str, cache_salt: Optional[str] = None) -> List[Dict[str, str]]:
+    """Build chat messages sharing a common prefix, with the target language last"""
+    return [
+        {"role": "system", "content": _salted(FANOUT_SYSTEM_PROMPT, cache_salt)},
+        {"role": "user", "content": text},
+        {"role": "user", "content": f"Translate the text above into {language_name(language)}."}
+    ]
+
+def build_independent_messages(text: str, language: str, cache_salt: Optional[str] = None) -> List[Dict[str, str]]:
+    """Build chat messages with the target language in the system prompt"""
+    return [
+        {"role": "system", "content": _salted(INDEPENDENT_SYSTEM_PROMPT.format(language=language_name(language)), cache_salt)},
+        {"role": "user", "content": text}
+    ]
+
+@dataclass
+class FanoutEvent:
+    """A streamed piece of a fan-out translation"""
+    language: str
+    content: str = ""
+    result: Optional[Dict[str, Any]] = None  # Set on the final event for a language
+
+class StreamingTimingTracker(TimingTracker):
+    """Timing tracker that also forwards each token to a queue"""
+
+    def __init__(self, language: str, queue: asyncio.Queue, first_token: Optional[asyncio.Event] = None):
+        super().__init__()
+        self.language = language
+        self.queue = queue
+        self.first_token = first_token
+
+    def record_token(self, content: str) -> None:
+        """Record a new token and stream it out"""
+        super().record_token(content)
+        if self.first_token is not None:
+            self.first_token.set()
+        self.queue.put_nowait(FanoutEvent(self.language, content))
+
+async def _translate_one(session: aiohttp.ClientSession, messages: List[Dict[str, str]], timing: TimingTracker, model_name: Optional[str], max_tokens: Optional[int] = None) -> Dict[str, Any]:
+    """Send one translation request through the SEA-LION or OpenAI async client"""
+    if model_name:
+        return await benchmark_openai_async(session, "", model_name, messages=messages, timing=timing, max_tokens=max_tokens or Limits.OPENAI_MAX_TOKENS)
+    return await benchmark_sealion_async(session, "", messages=messages, timing=timing, max_tokens=max_tokens)
+
+async def fanout_translate_stream(session: aiohttp.ClientSession, text: str, languages: List[str], model_name: Optional[str] = None, prime_prefix: bool = True, cache_salt: Optional[str] = None, max_tokens: Optional[int] = None) -> AsyncIterator[FanoutEvent]:
+    """
+    Translate one text into several languages at once, yielding tokens as they arrive
+    Each language finishes with an event carrying its result dict. When prime_prefix is
+    set, the remaining languages are sent once the first one produces a token, so the
+    shared prefix is already in the vLLM prefix cache instead of being prefilled N times.
+    Time to first token is measured from the start of the fan-out for every language,
+    including any wait on the primer. Uses SEA-LION unless an OpenAI model_name is given.
+    """
+    languages = list(dict.fromkeys(languages))
+    queue: asyncio.Queue = asyncio.Queue()
+    primed = asyncio.Event()
+    result_model = model_name or ModelNames.SEA_LION_MODEL
+    trackers = {
+        language: StreamingTimingTracker(language, queue, primed if i == 0 else None)
+        for i, language in enumerate(languages)
+    }
+
+    async def run(language: str) -> None:
+        timing = trackers[language]
+        try:
+            result = await _translate_one(session, build_fanout_messages(text, language, cache_salt), timing, model_name, max_tokens)
+        except Exception as e:
+            result = create_result_dict(result_model, timing, False, str(e))
+        if timing.first_token is not None:
+            timing.first_token.set()
+        queue.put_nowait(FanoutEvent(language, result={**result, "language": language}))
+
+    async def launch() -> None:
+        if prime_prefix and len(languages) > 1:
+            primer = asyncio.create_task(run(languages[0]))
+            try:
+                await primed.wait()
+            except asyncio.CancelledError:
+                primer.cancel()
+                raise
+            await asyncio.gather(primer, *(run(language) for language in languages[1:]))
+        else:
+            await asyncio.gather(*(run(language) for language in languages))
+
+    launcher = asyncio.create_task(launch())
+    remaining = len(languages)
+    try:
+        while remaining:
+            event = await queue.get()
+            if event.result is not None:
+                remaining -= 1
+            yield event
+    finally:
+        if not launcher.done():
+            launcher.cancel()
+            await asyncio.gather(launcher, return_exceptions=True)
+
+async def fanout_translate(session: aiohttp.ClientSession, text: str, languages: List[str], model_name: Optional[str] = None, prime_prefix: bool = True, cache_salt: Optional[str] = None, max_tokens: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """Translate one text into several languages and return the result dict per language"""
+    results = {}
+    async for event in fanout_translate_stream(session, text, languages, model_name, prime_prefix, cache_salt, max_tokens):
+        if event.result is not None:
+            results[event.language] = event.result
+    return results
+
+async def independent_translate(session: aiohttp.ClientSession, text: str, languages: List[str], model_name: Optional[str] = None, cache_salt: Optional[str] = None, max_tokens: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """Baseline: translate into each language with a fully independent request"""
+    languages = list(dict.fromkeys(languages))
+    result_model = model_name or ModelNames.SEA_LION_MODEL
+
+    async def run(language: str) -> Dict[str, Any]:
+        timing = TimingTracker()
+        try:
+            result = await _translate_one(session, build_independent_messages(text, language, cache_salt), timing, model_name, max_tokens)
+        except Exception as e:
+            result = create_result_dict(result_model, timing, False, str(e))
+        return {**result, "language": language}
+
+    results = await asyncio.gather(*(run(language) for language in languages))
+    return {result["language"]: result for result in results}
+
+# ============================================================================
+# BENCHMARK: FAN-OUT vs INDEPENDENT REQUESTS
+# ============================================================================
+
+def summarize_round(mode: str, results: Dict[str, Dict[str, Any]], wall_time: float) -> Dict[str, Any]:
+    """Summarize one round of translations into a single source text"""
+    successful = [r for r in results.values() if r.get('success', False)]
+    first_token_times = [r['time_to_first_token'] for r in successful if r.get('time_to_first_token')]
+    tokens_per_second = [r['tokens_per_second'] for r in successful if r.get('tokens_per_second')]
+
+    return {
+        "mode": mode,
+        "languages": len(results),
+        "successful": len(successful),
+        "wall_time": wall_time,
+        "avg_time_to_first_token": statistics.mean(first_token_times) if first_token_times else 0,
+        "max_time_to_first_token": max(first_token_times) if first_token_times else 0,
+        "total_throughput": sum(tokens_per_second) if tokens_per_second else 0,
+    }
+
+def print_fanout_comparison(mode_rounds: Dict[str, List[Dict[str, Any]]]):
+    """Print averaged fan-out vs independent results"""
+    print(f"\n{'='*60}")
+    print(f"FAN-OUT COMPARISON ({len(next(iter(mode_rounds.values())))} source texts)")
+    print(f"{'='*60}")
+
+    metrics = [
+        ("Wall time per text", "wall_time", "s"),
+        ("Avg time to first token", "avg_time_to_first_token", "s"),
+        ("Max time to first token", "max_time_to_first_token", "s"),
+        ("Total throughput", "total_throughput", "tok/s"),
+    ]
+
+    for metric_name, key, unit in metrics:
+        values = " | ".join(
+            f"{mode}: {statistics.mean(r[key] for r in rounds):.3f}{unit}"
+            for mode, rounds in mode_rounds.items()
+        )
+        print(f"{metric_name:<25}: {values}")
+
+    for mode, rounds in mode_rounds.items():
+        successful = sum(r['successful'] for r in rounds)
+        total = sum(r['languages'] for r in rounds)
+        print(f"{mode:<25}: {successful}/{total} translations succeeded")
+
+async def run_fanout_benchmark(session: aiohttp.ClientSession, texts: List[str], languages: List[str], run_id: str, model_name: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Compare fan-out translation against N independent requests
+    Every round gets its own cache salt at the start of the system prompt, so prefix cache
+    hits come from within a round rather than from an earlier mode or round. The salt is
+    derived from run_id, so a recorded run can be replayed with the same payloads.
+    """
+    modes = {
+        "independent": lambda text, salt: independent_translate(session, text, languages, model_name, salt),
+        "fanout": lambda text, salt: fanout_translate(session, text, languages, model_name, False, salt),
+        "fanout-primed": lambda text, salt: fanout_translate(session, text, languages, model_name, True, salt),
+    }
+    mode_rounds: Dict[str, List[Dict[str, Any]]] = {mode: [] for mode in modes}
+
+    for i, text in enumerate(texts):
+        print(f"\nSource text {i + 1}/{len(texts)}: {text}")
+        for mode, translate in modes.items():
+            salt = f"{mode}-{i}-{run_id}"
+            start_time = time.time()
+            results = await translate(text, salt)
+            summary = summarize_round(mode, results, time.time() - start_time)
+            mode_rounds[mode].append(summary)
+            print(f"  {mode:<14} wall {summary['wall_time']:.3f}s, avg TTFT {summary['avg_time_to_first_token']:.3f}s, {summary['successful']}/{summary['languages']} ok")
+            await asyncio.sleep(Timeouts.BETWEEN_TESTS)
+
+    return mode_rounds
+
+async def stream_demo(session: aiohttp.ClientSession, text: str, languages: List[str]):
+    """Print per-language tokens as a single fan-out streams in"""
+    print(f"\nSTREAMING FAN-OUT: {text}")
+    print("-" * 60)
+    async for event in fanout_translate_stream(session, text, languages):
+        if event.result is None:
+            continue
+        if event.result['success']:
+            print(f"[{event.language}] ({event.result['time_to_first_token']:.3f}s TTFT) {event.result['response']}")
+        else:
+            print(f"[{event.language}] failed: {event.result['error']}")
+
+async def main():
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description="Fan-out translation benchmark")
+    add_transport_args(parser)
+    args = parser.parse_args()
+
+    config = BenchmarkConfig(transport=create_transport(args))
+    # A fresh run id keeps live runs off each other's cached prefixes; replays reuse the
+    # recorded one so their payloads match the recording
+    if isinstance(config.transport, StreamReplayer):
+        run_id = config.transport.metadata.get("run_id", "")
+    else:
+        run_id = uuid.uuid4().hex[:8]
+    if isinstance(config.transport, StreamRecorder):
+        config.transport.metadata["run_id"] = run_id
+    languages = DEFAULT_FANOUT_LANGUAGES
+    texts = [
+        "Please remind Grandma to take her blood pressure medicine after breakfast.",
+        "The physiotherapy appointment has been moved to Thursday at 3pm, bring the referral letter.",
+        "Buy adult diapers, wet wipes and a new pill organiser from the pharmacy.",
+    ]
+
+    print("FAN-OUT TRANSLATION BENCHMARK: shared prefix vs independent requests")
+    print(f"Target languages: {', '.join(languages)}")
+    print("="*60)
+
+    print("\n")
+    await perform_warmup(config, texts[0])
+    print("Waiting for container stabilization...")
+    await asyncio.sleep(Timeouts.WARMUP_DELAY)
+
+    async with aiohttp.ClientSession(connector=config.create_connector(), timeout=config.create_timeout()) as session:
+        session = config.wrap_session(session)
+        await stream_demo(session, texts[0], languages)
+        mode_rounds = await run_fanout_benchmark(session, texts, languages, run_id)
+        print_fanout_comparison(mode_rounds)
+
+    if isinstance(config.transport, StreamRecorder):
+        config.transport.save()
+
+if __name__ == "__main__":
+    asyncio.run(main())
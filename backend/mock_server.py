@@ -0,0 +1,116 @@
+import argparse
+import asyncio
+import json
+import re
+import time
+from typing import Dict, Any, List
+from dataclasses import dataclass
+
+from aiohttp import web
+
+# OpenAI-compatible chat completions server for testing without a GPU or API key.
+# Translations are faked like the frontend's mock mode: "[Tagalog (Filipino)] Buy milk"
+
+FANOUT_INSTRUCTION = re.compile(r"^Translate the text above into (.+)\.$")
+SYSTEM_LANGUAGE = re.compile(r"translate the given text into (.+?)\.")
+
+class MockDefaults:
+    FIRST_TOKEN_DELAY = 0.05
+    TOKEN_DELAY = 0.01
+    PORT = 8001
+
+@dataclass
+class MockConfig:
+    """Simulated inference latency"""
+    first_token_delay: float = MockDefaults.FIRST_TOKEN_DELAY
+    token_delay: float = MockDefaults.TOKEN_DELAY
+
+CONFIG_KEY = web.AppKey("config", MockConfig)
+
+def mock_translation(messages: List[Dict[str, str]]) -> str:
+    """Fake a translation from fan-out or single-language chat messages"""
+    user_messages = [m["content"] for m in messages if m.get("role") == "user"]
+    system_prompt = next((m["content"] for m in messages if m.get("role") == "system"), "")
+
+    match = FANOUT_INSTRUCTION.match(user_messages[-1]) if user_messages else None
+    if match and len(user_messages) > 1:
+        return f"[{match.group(1)}] {user_messages[-2]}"
+
+    match = SYSTEM_LANGUAGE.search(system_prompt)
+    language = match.group(1) if match else "translated"
+    return f"[{language}] {user_messages[-1] if user_messages else ''}"
+
+def split_tokens(text: str) -> List[str]:
+    """Split text into word-sized pseudo tokens, keeping whitespace"""
+    return re.findall(r"\s*\S+", text) or [text]
+
+def completion_chunk(model: str, created: int, delta: Dict[str, Any], finish_reason: str = None) -> str:
+    """Format one streamed chat completion chunk as an SSE line"""
+    chunk = {
+        "id": f"chatcmpl-mock-{created}",
+        "object": "chat.completion.chunk",
+        "created": created,
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    return f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+
+async def chat_completions(request: web.Request) -> web.StreamResponse:
+    """Handle POST /v1/chat/completions, streaming when requested"""
+    try:
+        payload = await request.json()
+    except json.JSONDecodeError:
+        return web.json_response({"error": {"message": "Invalid JSON body"}}, status=400)
+
+    model = payload.get("model", "mock")
+    tokens = split_tokens(mock_translation(payload.get("messages", [])))
+    finish_reason = "stop"
+    if payload.get("max_tokens") and len(tokens) > payload["max_tokens"]:
+        tokens = tokens[:payload["max_tokens"]]
+        finish_reason = "length"
+    text = "".join(tokens)
+    created = int(time.time())
+    config = request.app[CONFIG_KEY]
+
+    if not payload.get("stream"):
+        await asyncio.sleep(config.first_token_delay)
+        return web.json_response({
+            "id": f"chatcmpl-mock-{created}",
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": finish_reason}],
+        })
+
+    response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+    await response.prepare(request)
+
+    await asyncio.sleep(config.first_token_delay)
+    for i, token in enumerate(tokens):
+        if i:
+            await asyncio.sleep(config.token_delay)
+        await response.write(completion_chunk(model, created, {"content": token}).encode('utf-8'))
+    await response.write(completion_chunk(model, created, {}, finish_reason).encode('utf-8'))
+    await response.write(b"data: [DONE]\n\n")
+    await response.write_eof()
+    return response
+
+def create_app(first_token_delay: float = MockDefaults.FIRST_TOKEN_DELAY, token_delay: float = MockDefaults.TOKEN_DELAY) -> web.Application:
+    """Create the mock inference app"""
+    app = web.Application()
+    app[CONFIG_KEY] = MockConfig(first_token_delay, token_delay)
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenAI-compatible inference server")
+    parser.add_argument("--port", type=int, default=MockDefaults.PORT)
+    parser.add_argument("--first-token-delay", type=float, default=MockDefaults.FIRST_TOKEN_DELAY, help="seconds before the first token")
+    parser.add_argument("--token-delay", type=float, default=MockDefaults.TOKEN_DELAY, help="seconds between tokens")
+    args = parser.parse_args()
+
+    print(f"Mock inference server: MODAL_URL=http://localhost:{args.port}/v1/chat/completions")
+    web.run_app(create_app(args.first_token_delay, args.token_delay), port=args.port)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import time
+from typing import Dict, Any, List, Optional, AsyncIterator
+
+import aiohttp
+
+# Recordings are gzipped JSON lines, one upstream stream per line:
+# {"key": ..., "url": ..., "model": ..., "status": 200, "events": [[offset_s, line], ...]}
+# Offsets are seconds since the request was sent, so time to first token is preserved.
+# Requests that fail before a response arrives (connect errors, timeouts) are recorded
+# with no status, an "error" and a "failed_at" offset, and fail the same way on replay.
+# Request headers are never stored, so API keys do not end up on disk.
+# An optional first line {"metadata": {...}} carries run details a replay needs to send
+# the same payloads, such as the cache salt run id used by fanout.py.
+
+TIMESTAMP_PRECISION = 6
+
+def request_key(payload: Optional[Dict[str, Any]]) -> str:
+    """
+    Stable key for matching a replayed request to its recording
+    The URL is left out so replays work without MODAL_URL set; the model in the payload
+    already tells SEA-LION and OpenAI requests apart.
+    """
+    body = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()[:16]
+
+def load_recordings(path: str) -> List[Dict[str, Any]]:
+    """Load recorded streams (and the metadata line, if any) from disk"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+class _RecordedContent:
+    """Async line iterator that tees upstream lines into a recording"""
+
+    def __init__(self, content: aiohttp.StreamReader, record: Dict[str, Any], start_time: float):
+        self.content = content
+        self.record = record
+        self.start_time = start_time
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        try:
+            async for line in self.content:
+                offset = round(time.time() - self.start_time, TIMESTAMP_PRECISION)
+                self.record["events"].append([offset, line.decode('utf-8').rstrip('\r\n')])
+                yield line
+        except Exception as e:
+            self.record["error"] = str(e)
+            raise
+
+class _RecordingResponse:
+    """Wraps an aiohttp response, recording the status, body and stream lines"""
+
+    def __init__(self, response: aiohttp.ClientResponse, record: Dict[str, Any], start_time: float):
+        self.response = response
+        self.record = record
+        self.status = response.status
+        self.content = _RecordedContent(response.content, record, start_time)
+
+    async def text(self) -> str:
+        body = await self.response.text()
+        self.record["body"] = body
+        return body
+
+class _RecordingRequest:
+    """Async context manager around session.post that records the response"""
+
+    def __init__(self, recorder: "StreamRecorder", session: aiohttp.ClientSession, url: str, kwargs: Dict[str, Any]):
+        self.recorder = recorder
+        self.request = session.post(url, **kwargs)
+        payload = kwargs.get("json")
+        self.record = {
+            "key": request_key(payload),
+            "url": url,
+            "model": (payload or {}).get("model"),
+            "status": None,
+            "events": [],
+        }
+
+    async def __aenter__(self) -> _RecordingResponse:
+        start_time = time.time()
+        try:
+            response = await self.request.__aenter__()
+        except Exception as e:
+            self.record["error"] = str(e)
+            self.record["error_type"] = "timeout" if isinstance(e, asyncio.TimeoutError) else "connection"
+            self.record["failed_at"] = round(time.time() - start_time, TIMESTAMP_PRECISION)
+            self.recorder.records.append(self.record)
+            raise
+        self.record["status"] = response.status
+        return _RecordingResponse(response, self.record, start_time)
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.recorder.records.append(self.record)
+        return await self.request.__aexit__(exc_type, exc, tb)
+
+class RecordingSession:
+    """Session stand-in that forwards requests upstream and records each stream"""
+
+    def __init__(self, recorder: "StreamRecorder", session: aiohttp.ClientSession):
+        self.recorder = recorder
+        self.session = session
+
+    def post(self, url: str, **kwargs) -> _RecordingRequest:
+        return _RecordingRequest(self.recorder, self.session, url, kwargs)
+
+class StreamRecorder:
+    """Collects upstream SSE streams from wrapped sessions and saves them to disk"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.records: List[Dict[str, Any]] = []
+        self.metadata: Dict[str, Any] = {}
+
+    def wrap(self, session: aiohttp.ClientSession) -> RecordingSession:
+        return RecordingSession(self, session)
+
+    def save(self) -> None:
+        """Write all recorded streams to the recording file"""
+        with gzip.open(self.path, 'wt', encoding='utf-8') as f:
+            if self.metadata:
+                f.write(json.dumps({"metadata": self.metadata}, ensure_ascii=False, separators=(',', ':')) + "\n")
+            for record in self.records:
+                f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n")
+        print(f"Recorded {len(self.records)} streams to {self.path}")
+
+class _ReplayContent:
+    """Async line iterator that replays recorded lines at recorded or scaled timing"""
+
+    def __init__(self, record: Dict[str, Any], start_time: float, speed: float):
+        self.record = record
+        self.start_time = start_time
+        self.speed = speed
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for offset, line in self.record["events"]:
+            if self.speed > 0:
+                delay = self.start_time + offset / self.speed - time.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            yield (line + "\n").encode('utf-8')
+        if self.record.get("error"):
+            raise aiohttp.ClientPayloadError(self.record["error"])
+
+class _ReplayResponse:
+    """Response stand-in exposing the parts of aiohttp's response the clients use"""
+
+    def __init__(self, record: Dict[str, Any], start_time: float, speed: float):
+        self.record = record
+        self.status = record["status"]
+        self.content = _ReplayContent(record, start_time, speed)
+
+    async def text(self) -> str:
+        return self.record.get("body", "")
+
+class _ReplayRequest:
+    """Async context manager returning a replayed response"""
+
+    def __init__(self, record: Dict[str, Any], speed: float):
+        self.record = record
+        self.speed = speed
+
+    async def __aenter__(self) -> _ReplayResponse:
+        start_time = time.time()
+        if self.record["status"] is None:
+            # The request failed before a response arrived when it was recorded
+            if self.speed > 0:
+                await asyncio.sleep(self.record.get("failed_at", 0) / self.speed)
+            if self.record.get("error_type") == "timeout":
+                raise asyncio.TimeoutError(self.record.get("error", ""))
+            raise aiohttp.ClientConnectionError(self.record.get("error", ""))
+        return _ReplayResponse(self.record, start_time, self.speed)
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+class ReplaySession:
+    """Session stand-in that serves recorded streams instead of calling upstream"""
+
+    def __init__(self, replayer: "StreamReplayer"):
+        self.replayer = replayer
+
+    def post(self, url: str, **kwargs) -> _ReplayRequest:
+        return _ReplayRequest(self.replayer.next_record(url, kwargs.get("json")), self.replayer.speed)
+
+class StreamReplayer:
+    """
+    Replays recorded SSE streams with no network access
+    Recordings for the same request are served in recorded order and cycled when a run
+    sends more requests than were recorded. speed scales the recorded timing (2.0 replays
+    twice as fast), and 0 replays with no delays at all.
+    """
+
+    def __init__(self, path: str, speed: float = 1.0):
+        self.path = path
+        self.speed = speed
+        self.recordings: Dict[str, List[Dict[str, Any]]] = {}
+        self.positions: Dict[str, int] = {}
+        self.metadata: Dict[str, Any] = {}
+        for record in load_recordings(path):
+            if "metadata" in record:
+                self.metadata = record["metadata"]
+                continue
+            self.recordings.setdefault(record["key"], []).append(record)
+
+    def wrap(self, session: Optional[aiohttp.ClientSession] = None) -> ReplaySession:
+        return ReplaySession(self)
+
+    def next_record(self, url: str, payload: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Get the next recorded stream for a request"""
+        key = request_key(payload)
+        records = self.recordings.get(key)
+        if not records:
+            raise KeyError(f"No recorded stream for request to {url} ({(payload or {}).get('model')}) in {self.path}")
+        position = self.positions.get(key, 0)
+        self.positions[key] = position + 1
+        return records[position % len(records)]
@@ -72,6 +72,7 @@ def serve():
 
     cmd += ["--enforce-eager" if FAST_BOOT else "--no-enforce-eager"]
     cmd += ["--tensor-parallel-size", str(N_GPU)]
+    cmd += ["--enable-prefix-caching"]  # reuse KV cache across requests sharing a prompt prefix (see fanout.py)
 
     print(cmd)
 
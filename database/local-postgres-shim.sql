@@ -0,0 +1,29 @@
+-- Local Postgres shim for Careloop
+-- Provides the Supabase objects supabase-setup.sql depends on, so the schema can be
+-- loaded into a plain local Postgres (e.g. for running backend/backfill.py):
+--   psql "$DATABASE_URL" -f local-postgres-shim.sql -f supabase-setup.sql
+
+CREATE SCHEMA IF NOT EXISTS auth;
+
+CREATE TABLE IF NOT EXISTS auth.users (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  email TEXT,
+  raw_user_meta_data JSONB DEFAULT '{}'::JSONB,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- No authenticated user locally; RLS only applies to non-owner roles anyway
+CREATE OR REPLACE FUNCTION auth.uid()
+RETURNS UUID
+LANGUAGE sql STABLE
+AS $$
+  SELECT NULLIF(current_setting('request.jwt.claim.sub', true), '')::UUID;
+$$;
+
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_publication WHERE pubname = 'supabase_realtime') THEN
+    CREATE PUBLICATION supabase_realtime;
+  END IF;
+END
+$$;
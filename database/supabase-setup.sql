@@ -45,11 +45,26 @@ CREATE TABLE comments (
   author_name TEXT NOT NULL
 );
 
+-- Create translations table (filled by backend/backfill.py)
+-- content_hash is the hex SHA-256 of the source text, so edited text is retranslated
+CREATE TABLE translations (
+  id BIGSERIAL PRIMARY KEY,
+  source_table TEXT NOT NULL CHECK (source_table IN ('todos', 'comments')),
+  row_id TEXT NOT NULL,
+  field TEXT NOT NULL CHECK (field IN ('label', 'notes', 'reward', 'comment_content')),
+  language TEXT NOT NULL,
+  content_hash TEXT NOT NULL,
+  translated_text TEXT NOT NULL,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  UNIQUE (source_table, row_id, field, language, content_hash)
+);
+
 -- Enable Row Level Security
 ALTER TABLE groups ENABLE ROW LEVEL SECURITY;
 ALTER TABLE profiles ENABLE ROW LEVEL SECURITY;
 ALTER TABLE todos ENABLE ROW LEVEL SECURITY;
 ALTER TABLE comments ENABLE ROW LEVEL SECURITY;
+ALTER TABLE translations ENABLE ROW LEVEL SECURITY;
 
 -- Groups RLS Policies
 CREATE POLICY "Users can create groups" ON groups
@@ -126,6 +141,23 @@ CREATE POLICY "Users can create comments on group todos" ON comments
 CREATE POLICY "Users can delete their own comments" ON comments
   FOR DELETE USING (auth.uid() = user_id);
 
+-- Translations RLS Policies (rows are written by the backfill worker)
+CREATE POLICY "Users can view translations of group content" ON translations
+  FOR SELECT USING (
+    (source_table = 'todos' AND row_id IN (
+      SELECT id::TEXT FROM todos WHERE group_id IN (
+        SELECT group_id FROM profiles WHERE id = auth.uid()
+      )
+    ))
+    OR (source_table = 'comments' AND row_id IN (
+      SELECT comments.id::TEXT FROM comments
+      JOIN todos ON todos.id = comments.todo_id
+      WHERE todos.group_id IN (
+        SELECT group_id FROM profiles WHERE id = auth.uid()
+      )
+    ))
+  );
+
 -- Create RPC function for getting group members
 CREATE OR REPLACE FUNCTION get_members_of_group(p_group_id UUID)
 RETURNS TABLE(id UUID, display_name TEXT)
@@ -162,6 +194,7 @@ CREATE INDEX idx_todos_user_id ON todos(user_id);
 CREATE INDEX idx_todos_date_time ON todos(date_and_time DESC);
 CREATE INDEX idx_comments_todo_id ON comments(todo_id);
 CREATE INDEX idx_comments_created_at ON comments(created_at);
+CREATE INDEX idx_translations_content_hash ON translations(content_hash, language);
 
 -- Enable realtime for todos and comments (optional)
 ALTER PUBLICATION supabase_realtime ADD TABLE todos;